@@ -3,21 +3,121 @@
 Script to fetch open PRs related to FIPs from GitHub
 """
 
+import urllib.error
 import urllib.request
 import json
 import re
-from datetime import datetime
+from collections import defaultdict
 
-GITHUB_API_BASE = 'https://api.github.com/repos/filecoin-project/FIPs'
+from github_http import (FIP_NUMBER_RE, GITHUB_API_BASE, RATE_LIMIT_RETRIES, json_loads,
+                         note_rate_limit, wait_for_rate_limit)
+
+PR_CACHE_FILE = '.pr_cache.json'
+
+NEXT_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+CATEGORY_KEYWORDS = {
+    'new': 'New FIP', 'add': 'New FIP', 'create': 'New FIP',
+    'update': 'Update FIP', 'modify': 'Update FIP', 'change': 'Update FIP',
+    'status': 'Status Change', 'final': 'Status Change', 'draft': 'Status Change',
+    'supersede': 'Supersede', 'replace': 'Supersede',
+}
+CATEGORY_ORDER = ['New FIP', 'Update FIP', 'Status Change', 'Supersede']
+BODY_CATEGORIES = {'Status Change', 'Supersede'}
+# Lookahead so overlapping keywords are all found, matching plain substring tests;
+# ASCII-only case folding so a match is always a CATEGORY_KEYWORDS key (no 'ſ' -> 's')
+CATEGORY_RE = re.compile('(?=(' + '|'.join(CATEGORY_KEYWORDS) + '))', re.IGNORECASE | re.ASCII)
+
+PR_ITEM_TEMPLATE = '''
+                <div class="pr-item">
+                    <div class="pr-header-row">
+                        <a href="{url}" target="_blank" class="pr-link">#{pr_number}: {title}</a>
+                        <span class="pr-badge">{categories}</span>
+                    </div>
+                    <div class="pr-meta">
+                        <span>By @{author}</span>
+                        <span>•</span>
+                        <span>Created: {created_date}</span>
+                        <span>•</span>
+                        <span>Branch: {branch}</span>
+                    </div>
+                    {body_html}
+                </div>
+            '''
+
+def load_etag_cache(cache_file=PR_CACHE_FILE):
+    """Load the {url: {etag, body, link}} cache from disk"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_etag_cache(cache, cache_file=PR_CACHE_FILE):
+    """Write the ETag cache back to disk"""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Warning: Could not write {cache_file}: {e}")
+
+def get_with_etag(url, cache_file=PR_CACHE_FILE):
+    """GET a URL, reusing the cached body when GitHub answers 304 Not Modified
+    
+    Returns a (body, link_header) tuple.
+    """
+    cache = load_etag_cache(cache_file)
+    entry = cache.get(url)
+    
+    request = urllib.request.Request(url, headers={'Accept': 'application/vnd.github+json'})
+    if entry:
+        request.add_header('If-None-Match', entry['etag'])
+    
+    for attempt in range(RATE_LIMIT_RETRIES):
+        wait_for_rate_limit()
+        try:
+            with urllib.request.urlopen(request) as response:
+                body = response.read().decode('utf-8')
+                headers = response.headers
+            break
+        except urllib.error.HTTPError as e:
+            delay = note_rate_limit(e.headers)
+            if e.code == 304 and entry:
+                return entry['body'], entry.get('link', '')
+            if e.code in (403, 429) and delay and attempt < RATE_LIMIT_RETRIES - 1:
+                print("Rate limited by GitHub, retrying...")
+                continue
+            raise
+    
+    # The next call waits for the quota rather than failing
+    note_rate_limit(headers)
+    
+    etag = headers.get('ETag')
+    link = headers.get('Link', '')
+    if etag:
+        cache[url] = {'etag': etag, 'body': body, 'link': link}
+        save_etag_cache(cache, cache_file)
+    return body, link
+
+def next_page_url(link_header):
+    """Return the rel="next" URL from an RFC 5988 Link header, if any"""
+    match = NEXT_LINK_RE.search(link_header or '')
+    return match.group(1) if match else None
 
 def fetch_open_prs():
-    """Fetch all open pull requests"""
+    """Fetch all open pull requests, following Link: rel="next" pagination"""
     url = f"{GITHUB_API_BASE}/pulls?state=open&per_page=100"
+    prs = []
     
     try:
-        with urllib.request.urlopen(url) as response:
-            prs = json.loads(response.read().decode('utf-8'))
-            return prs
+        while url:
+            body, link = get_with_etag(url)
+            page = json_loads(body)
+            if not page:
+                break
+            prs.extend(page)
+            url = next_page_url(link)
+        return prs
     except Exception as e:
         print(f"Error fetching PRs: {e}")
         return []
@@ -26,80 +126,80 @@ def extract_fip_numbers(text):
     """Extract FIP numbers from PR title, body, or branch name"""
     fip_numbers = set()
     
-    # Pattern to match FIP-XXXX or FIP XXXX or fip-xxxx
-    patterns = [
-        r'FIP[-\s]?(\d{4})',  # FIP-0001, FIP 0001, FIP0001
-        r'fip[-\s]?(\d{4})',   # fip-0001 (lowercase)
-        r'\[(\d{4})\]',        # [0001] format
-        r'#(\d{4})',           # #0001 format
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            fip_numbers.add(match.zfill(4))
+    for match in FIP_NUMBER_RE.findall(text):
+        fip_numbers.add(match.zfill(4))
     
     return sorted(list(fip_numbers))
 
 def categorize_pr(pr):
     """Categorize PR based on its content"""
-    title = pr.get('title', '').lower()
-    body = pr.get('body', '').lower()
-    combined = f"{title} {body}"
-    
-    categories = []
+    title = pr.get('title') or ''
+    body = pr.get('body') or ''
     
-    if 'new' in title or 'add' in title or 'create' in title:
-        categories.append('New FIP')
-    if 'update' in title or 'modify' in title or 'change' in title:
-        categories.append('Update FIP')
-    if 'status' in combined or 'final' in combined or 'draft' in combined:
-        categories.append('Status Change')
-    if 'supersede' in combined or 'replace' in combined:
-        categories.append('Supersede')
+    # Title keywords can imply any category, body keywords only status/supersede ones
+    found = {CATEGORY_KEYWORDS[m.lower()] for m in CATEGORY_RE.findall(title)}
+    for match in CATEGORY_RE.findall(body):
+        category = CATEGORY_KEYWORDS[match.lower()]
+        if category in BODY_CATEGORIES:
+            found.add(category)
     
+    categories = [c for c in CATEGORY_ORDER if c in found]
     return categories if categories else ['General']
 
+def summarize_pr(pr):
+    """Build the dashboard record for a single PR"""
+    title = pr.get('title') or ''
+    body = pr.get('body') or ''
+    user = pr.get('user') or {}
+    head = pr.get('head') or {}
+    branch = head.get('ref', '')
+    
+    # Extract FIP numbers
+    search_text = f"{title} {body} {branch}"
+    fip_numbers = extract_fip_numbers(search_text)
+    
+    # If no FIP numbers found, check if it mentions FIPs generally
+    if not fip_numbers and 'fip' in search_text.lower():
+        fip_numbers = ['General']
+    
+    # ISO-8601 timestamps already lead with YYYY-MM-DD
+    created_at = pr.get('created_at') or ''
+    updated_at = pr.get('updated_at') or ''
+    
+    record = {
+        'pr_number': pr.get('number'),
+        'title': title,
+        'body': body if len(body) <= 200 else body[:200] + '...',
+        'url': pr.get('html_url'),
+        'author': user.get('login', 'Unknown'),
+        'created_at': created_at,
+        'updated_at': updated_at,
+        'created_date': created_at[:10],
+        'updated_date': updated_at[:10],
+        'branch': branch,
+        'fip_numbers': fip_numbers,
+        'categories': categorize_pr(pr)
+    }
+    # Render once here; generate_pr_html reuses it for every FIP the PR touches
+    record['html'] = render_pr_item(record)
+    return record
+
 def process_prs(prs):
     """Process PRs and extract FIP information"""
-    fip_prs = []
-    
-    for pr in prs:
-        title = pr.get('title', '')
-        body = pr.get('body', '')
-        number = pr.get('number')
-        html_url = pr.get('html_url')
-        user = pr.get('user', {}).get('login', 'Unknown')
-        created_at = pr.get('created_at', '')
-        updated_at = pr.get('updated_at', '')
-        branch = pr.get('head', {}).get('ref', '')
-        
-        # Extract FIP numbers
-        search_text = f"{title} {body} {branch}"
-        fip_numbers = extract_fip_numbers(search_text)
-        
-        # If no FIP numbers found, check if it's a general FIP-related PR
-        if not fip_numbers:
-            # Check if it mentions FIPs generally
-            if 'fip' in search_text.lower():
-                fip_numbers = ['General']
-        
-        categories = categorize_pr(pr)
-        
-        fip_prs.append({
-            'pr_number': number,
-            'title': title,
-            'body': body[:200] + '...' if len(body) > 200 else body,
-            'url': html_url,
-            'author': user,
-            'created_at': created_at,
-            'updated_at': updated_at,
-            'branch': branch,
-            'fip_numbers': fip_numbers,
-            'categories': categories
-        })
-    
-    return fip_prs
+    return [summarize_pr(pr) for pr in prs]
+
+def render_pr_item(pr):
+    """Render one PR as an HTML list item"""
+    return PR_ITEM_TEMPLATE.format(
+        url=pr['url'],
+        pr_number=pr['pr_number'],
+        title=pr['title'],
+        categories=', '.join(pr['categories']),
+        author=pr['author'],
+        created_date=pr['created_date'],
+        branch=pr['branch'],
+        body_html=f'<div class="pr-body">{pr["body"]}</div>' if pr['body'] else ''
+    )
 
 def generate_pr_html(fip_prs):
     """Generate HTML for PRs section"""
@@ -107,7 +207,7 @@ def generate_pr_html(fip_prs):
         return '<div class="no-prs">No open PRs found.</div>'
     
     # Group PRs by FIP number
-    prs_by_fip = {}
+    prs_by_fip = defaultdict(list)
     general_prs = []
     
     for pr in fip_prs:
@@ -115,67 +215,35 @@ def generate_pr_html(fip_prs):
             general_prs.append(pr)
         else:
             for fip_num in pr['fip_numbers']:
-                if fip_num not in prs_by_fip:
-                    prs_by_fip[fip_num] = []
                 prs_by_fip[fip_num].append(pr)
     
-    html = '<div class="prs-container">'
+    parts = []
+    append = parts.append
+    append('<div class="prs-container">')
     
     # PRs grouped by FIP
     if prs_by_fip:
-        html += '<div class="prs-section"><h3>PRs by FIP</h3>'
+        append('<div class="prs-section"><h3>PRs by FIP</h3>')
         for fip_num in sorted(prs_by_fip.keys()):
             prs = prs_by_fip[fip_num]
-            html += f'<div class="fip-pr-group">'
-            html += f'<div class="fip-pr-header"><strong>FIP-{fip_num}</strong> <span class="pr-count">({len(prs)} PR{"s" if len(prs) > 1 else ""})</span></div>'
-            html += '<div class="pr-list">'
+            append('<div class="fip-pr-group">')
+            append(f'<div class="fip-pr-header"><strong>FIP-{fip_num}</strong> <span class="pr-count">({len(prs)} PR{"s" if len(prs) > 1 else ""})</span></div>')
+            append('<div class="pr-list">')
             for pr in prs:
-                created_date = datetime.fromisoformat(pr['created_at'].replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                html += f'''
-                    <div class="pr-item">
-                        <div class="pr-header-row">
-                            <a href="{pr['url']}" target="_blank" class="pr-link">#{pr['pr_number']}: {pr['title']}</a>
-                            <span class="pr-badge">{', '.join(pr['categories'])}</span>
-                        </div>
-                        <div class="pr-meta">
-                            <span>By @{pr['author']}</span>
-                            <span>•</span>
-                            <span>Created: {created_date}</span>
-                            <span>•</span>
-                            <span>Branch: {pr['branch']}</span>
-                        </div>
-                        {f'<div class="pr-body">{pr["body"]}</div>' if pr["body"] else ''}
-                    </div>
-                '''
-            html += '</div></div>'
-        html += '</div>'
+                append(pr['html'])
+            append('</div></div>')
+        append('</div>')
     
     # General FIP-related PRs
     if general_prs:
-        html += '<div class="prs-section"><h3>General FIP-Related PRs</h3>'
-        html += '<div class="pr-list">'
+        append('<div class="prs-section"><h3>General FIP-Related PRs</h3>')
+        append('<div class="pr-list">')
         for pr in general_prs:
-            created_date = datetime.fromisoformat(pr['created_at'].replace('Z', '+00:00')).strftime('%Y-%m-%d')
-            html += f'''
-                <div class="pr-item">
-                    <div class="pr-header-row">
-                        <a href="{pr['url']}" target="_blank" class="pr-link">#{pr['pr_number']}: {pr['title']}</a>
-                        <span class="pr-badge">{', '.join(pr['categories'])}</span>
-                    </div>
-                    <div class="pr-meta">
-                        <span>By @{pr['author']}</span>
-                        <span>•</span>
-                        <span>Created: {created_date}</span>
-                        <span>•</span>
-                        <span>Branch: {pr['branch']}</span>
-                    </div>
-                    {f'<div class="pr-body">{pr["body"]}</div>' if pr["body"] else ''}
-                </div>
-            '''
-        html += '</div></div>'
+            append(pr['html'])
+        append('</div></div>')
     
-    html += '</div>'
-    return html
+    append('</div>')
+    return ''.join(parts)
 
 def main():
     print("Fetching open PRs from GitHub...")
@@ -1,93 +1,262 @@
+import csv
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 import re
 import requests
-import pandas as pd
+from collections import defaultdict
 from dotenv import load_dotenv
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from github_http import GRAPHQL_URL, RATE_LIMIT_RETRIES, json_loads, note_rate_limit, wait_for_rate_limit
 
 load_dotenv()
 TOKEN = os.getenv("GITHUB_TOKEN")
 HEADERS = {"Authorization": f"token {TOKEN}"}
+ETAG_CACHE_FILE = ".etag_cache.json"
+MEETINGS_CACHE_FILE = ".meetings_cache.json"
+ATTENDEE_RE = re.compile(r"attendees?:\s*(.+)", re.IGNORECASE)
+NAME_SPLIT_RE = re.compile(r"[,•\n]")
+
+
+# ========== HTTP HELPERS ==========
+
+def make_session(headers=None):
+    """Session with a pooled, retrying adapter so connections are reused"""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    retry = Retry(total=5, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = make_session(HEADERS)
+# Anonymous fallback when the token is missing or rejected
+ANON_SESSION = make_session()
+
+def load_etag_cache():
+    try:
+        with open(ETAG_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+_etag_cache = load_etag_cache()
+
+def save_etag_cache():
+    with open(ETAG_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(_etag_cache, f)
+
+def get_with_etag(url, session=SESSION):
+    """GET url and return its body, reusing the cached copy on 304 Not Modified"""
+    entry = _etag_cache.get(url)
+    req_headers = {}
+    if entry:
+        req_headers["If-None-Match"] = entry["etag"]
+
+    for _ in range(RATE_LIMIT_RETRIES):
+        wait_for_rate_limit()
+        resp = session.get(url, headers=req_headers)
+        delay = note_rate_limit(resp.headers)
+        # Only repeat the request when it was actually rejected for rate limiting
+        if not (resp.status_code in (403, 429) and delay):
+            break
+
+    if resp.status_code == 304 and entry:
+        return entry["body"]
+
+    etag = resp.headers.get("ETag")
+    if resp.ok and etag:
+        _etag_cache[url] = {"etag": etag, "body": resp.text}
+    return resp.text
+
+def post_graphql(query, variables=None):
+    """Run a GitHub GraphQL query and return its data, or None on error"""
+    for _ in range(RATE_LIMIT_RETRIES):
+        wait_for_rate_limit()
+        resp = SESSION.post(GRAPHQL_URL, json={"query": query, "variables": variables or {}})
+        delay = note_rate_limit(resp.headers)
+        # Retry after the wait, as get_with_etag does, instead of falling back to REST
+        if not (resp.status_code in (403, 429) and delay):
+            break
+
+    try:
+        result = json_loads(resp.content)
+    except ValueError:
+        print(f"⚠️  GraphQL Error: HTTP {resp.status_code}")
+        return None
+    if not resp.ok or result.get("errors"):
+        errors = result.get("errors") or [result]
+        print(f"⚠️  GraphQL Error: {errors[0].get('message', resp.status_code)}")
+        return None
+    return result["data"]
+
 
 # ========== 1️⃣ CORE DEVS ATTENDANCE ==========
 
+def count_attendees(raw_url):
+    """Download one meeting file and count its attendees (None if not listed)
+    
+    Raises on a failed download, so an error page is never counted as a meeting.
+    """
+    # Files are only fetched when their sha changed, so there is nothing to revalidate
+    resp = ANON_SESSION.get(raw_url)
+    resp.raise_for_status()
+    text = resp.text
+    attendees = ATTENDEE_RE.findall(text)
+    if not attendees:
+        return None
+    # Split names separated by commas or newlines
+    names = NAME_SPLIT_RE.split(attendees[0])
+    names = [n.strip() for n in names if n.strip()]
+    return len(names)
+
 def fetch_coredevs_attendance():
     repo = "filecoin-project/core-devs"
     url = f"https://api.github.com/repos/{repo}/contents/meetings"
     
     # Try with headers first, fallback to no auth if needed
-    resp = requests.get(url, headers=HEADERS)
-    files = resp.json()
+    files = json_loads(get_with_etag(url))
     
     # Check if we got an error message
     if isinstance(files, dict) and "message" in files:
         print(f"⚠️  API Error: {files['message']}")
         print("Trying without authentication...")
-        resp = requests.get(url)
-        files = resp.json()
+        files = json_loads(get_with_etag(url, session=ANON_SESSION))
     
     if not isinstance(files, list):
         print(f"❌ Unexpected response format: {type(files)}")
-        return pd.DataFrame()
+        return []
+
+    meetings = [f for f in files if f["name"].endswith(".md")]
+
+    # {filename: {"sha", "attendees"}} from the last run; the Contents API sha
+    # changes whenever a file does, so only new or edited meetings are downloaded
+    try:
+        with open(MEETINGS_CACHE_FILE, encoding="utf-8") as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        cached = {}
+    stale = [f for f in meetings if cached.get(f["name"], {}).get("sha") != f["sha"]]
+    print(f"Downloading {len(stale)} new or changed meeting file(s)...")
+
+    # Downloads are independent, so overlap them on the shared connection pool
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        futures = [(f, ex.submit(count_attendees, f["download_url"])) for f in stale]
+        for f, future in futures:
+            try:
+                count = future.result()
+            except requests.RequestException as e:
+                # Keep the old entry (if any) so the file is retried next run
+                print(f"⚠️  Could not download {f['name']}: {e}")
+                continue
+            cached[f["name"]] = {"sha": f["sha"], "attendees": count}
+    save_etag_cache()
+
+    current = {f["name"] for f in meetings}
+    cached = {name: entry for name, entry in cached.items() if name in current}
+    with open(MEETINGS_CACHE_FILE, "w", encoding="utf-8") as cache_file:
+        json.dump(cached, cache_file)
 
     data = []
-    for f in files:
-        if f["name"].endswith(".md"):
-            raw_url = f["download_url"]
-            text = requests.get(raw_url).text
-            attendees = re.findall(r"(?i)attendees?:\s*(.+)", text)
-            if attendees:
-                # Split names separated by commas or newlines
-                names = re.split(r"[,•\n]", attendees[0])
-                names = [n.strip() for n in names if n.strip()]
-                data.append({
-                    "Meeting": f["name"].replace(".md",""),
-                    "Attendees": len(names)
-                })
-    df = pd.DataFrame(data)
-    df.to_csv("coredevs_attendance.csv", index=False)
+    for f in meetings:
+        # Files that have never downloaded successfully have no entry yet
+        count = cached.get(f["name"], {}).get("attendees")
+        if count is not None:
+            data.append({
+                "Meeting": f["name"].replace(".md",""),
+                "Attendees": count
+            })
+    with open("coredevs_attendance.csv", "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=["Meeting", "Attendees"])
+        writer.writeheader()
+        writer.writerows(data)
     print("✅ Saved coredevs_attendance.csv")
-    return df
+    return data
 
 
 # ========== 2️⃣ FIP DISCUSSION COMMENTS ==========
 
-def fetch_fip_comments():
+DISCUSSIONS_QUERY = """
+query($cursor: String) {
+  repository(owner: "filecoin-project", name: "FIPs") {
+    discussions(first: 100, after: $cursor) {
+      pageInfo { endCursor hasNextPage }
+      nodes { title comments { totalCount } createdAt }
+    }
+  }
+}
+"""
+
+def fetch_discussions_graphql():
+    """Fetch only title, comment count and creation date; None if GraphQL fails"""
+    discussions = []
+    cursor = None
+    while True:
+        data = post_graphql(DISCUSSIONS_QUERY, {"cursor": cursor})
+        if data is None:
+            return None
+        page = data["repository"]["discussions"]
+        for node in page["nodes"]:
+            discussions.append({
+                "title": node["title"],
+                "comments": node["comments"]["totalCount"],
+                "created_at": node["createdAt"]
+            })
+        if not page["pageInfo"]["hasNextPage"]:
+            return discussions
+        cursor = page["pageInfo"]["endCursor"]
+
+def fetch_discussions_rest():
     repo = "filecoin-project/FIPs"
     discussions_url = f"https://api.github.com/repos/{repo}/discussions"
     all_discussions = []
     page = 1
 
     while True:
-        resp = requests.get(f"{discussions_url}?per_page=100&page={page}", headers=HEADERS)
-        page_data = resp.json()
+        page_url = f"{discussions_url}?per_page=100&page={page}"
+        page_data = json_loads(get_with_etag(page_url))
         
         # Check if we got an error message
         if isinstance(page_data, dict) and "message" in page_data:
             print(f"⚠️  API Error: {page_data['message']}")
             print("Trying without authentication...")
-            resp = requests.get(f"{discussions_url}?per_page=100&page={page}")
-            page_data = resp.json()
+            page_data = json_loads(get_with_etag(page_url, session=ANON_SESSION))
         
         if not page_data or (isinstance(page_data, dict) and "message" in page_data):
             break
         all_discussions.extend(page_data)
         page += 1
+    save_etag_cache()
+    return all_discussions
 
-    rows = []
+def fetch_fip_comments():
+    # GraphQL needs a token; without one (or on error) use the REST listing
+    all_discussions = fetch_discussions_graphql() if TOKEN else None
+    if all_discussions is None:
+        print("Using REST discussions API...")
+        all_discussions = fetch_discussions_rest()
+
+    # Average comments per discussion, bucketed by creation month
+    comment_sums = defaultdict(int)
+    discussion_counts = defaultdict(int)
     for d in all_discussions:
-        title = d["title"]
-        num_comments = d["comments"]
-        created_at = datetime.strptime(d["created_at"], "%Y-%m-%dT%H:%M:%SZ")
-        rows.append({
-            "FIP_Title": title,
-            "Comments": num_comments,
-            "Month": created_at.strftime("%Y-%m")
-        })
-
-    df = pd.DataFrame(rows)
-    summary = df.groupby("Month")["Comments"].mean().reset_index()
-    summary.to_csv("fip_comment_counts.csv", index=False)
+        # GitHub timestamps are ISO-8601 UTC, so the prefix is already YYYY-MM
+        month = d["created_at"][:7]
+        comment_sums[month] += d["comments"]
+        discussion_counts[month] += 1
+
+    summary = [
+        {"Month": month, "Comments": comment_sums[month] / discussion_counts[month]}
+        for month in sorted(comment_sums)
+    ]
+    with open("fip_comment_counts.csv", "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=["Month", "Comments"])
+        writer.writeheader()
+        writer.writerows(summary)
     print("✅ Saved fip_comment_counts.csv")
     return summary
 
@@ -96,11 +265,13 @@ def fetch_fip_comments():
 
 if __name__ == "__main__":
     print("Fetching Core Devs attendance...")
-    a_df = fetch_coredevs_attendance()
-    print(a_df.head())
+    attendance = fetch_coredevs_attendance()
+    for row in attendance[:5]:
+        print(row)
 
     print("\nFetching FIP comment counts...")
-    c_df = fetch_fip_comments()
-    print(c_df.head())
+    comments = fetch_fip_comments()
+    for row in comments[:5]:
+        print(row)
 
     print("\n✅ Done! Use these CSVs to plot your graphs.")
\ No newline at end of file
@@ -3,15 +3,57 @@
 Script to track FIP status changes month-on-month using GitHub commit history
 """
 
-import urllib.request
+import base64
+import functools
+import gzip
+import hashlib
+import html
+import os
+import time
 import json
-import re
+import types
 from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-
-GITHUB_API_BASE = 'https://api.github.com/repos/filecoin-project/FIPs'
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, TextIO, Tuple
+
+from github_http import (FIP_ROW_RE, GITHUB_API_BASE, GITHUB_TOKEN, GRAPHQL_URL, HTTPStatusError,
+                         find_fip_table, get_cached, get_status_class, http_get, http_request,
+                         json_loads, page_digest, page_unchanged, write_atomic)
+
+try:
+    from ciso8601 import parse_datetime as parse_github_timestamp
+except ImportError:
+    def parse_github_timestamp(value: str) -> datetime:
+        """Parse GitHub's fixed-format YYYY-MM-DDTHH:MM:SSZ timestamps"""
+        return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                        int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                        tzinfo=timezone.utc)
+
+RAW_BASE_URL = 'https://raw.githubusercontent.com/filecoin-project/FIPs'
 README_PATH = 'README.md'
+MAX_WORKERS = 12
+CACHE_DIR = Path('.cache')
+COMMITS_CACHE_TTL = 10 * 60  # seconds
+OUTPUT_FILE = 'fips-timeline-tracker.html'
+HASH_FILE = OUTPUT_FILE + '.hash'
+
+# Line prefixes of the README FIP table's header and rows (see FIP_ROW_RE)
+FIP_TABLE_MARKERS = ('| FIP #', '| [')
+COMPARE_FILES_LIMIT = 300
+
+def write_cache_file(path: Path, data: str, compress: bool = False):
+    """Atomically write a cache file so a crash never leaves a truncated entry"""
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        opener = gzip.open if compress else open
+        with opener(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: Could not write cache file {path}: {e}")
 
 def fetch_commits_since_date(since_date: str = None):
     """Fetch commits to README.md since a given date"""
@@ -19,128 +61,317 @@ def fetch_commits_since_date(since_date: str = None):
     if since_date:
         url += f"&since={since_date}"
     
+    # Reuse a recent listing instead of hitting the API on back-to-back runs
+    cache_key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    cache_path = CACHE_DIR / f"commits-{cache_key}.json"
+    try:
+        if time.time() - cache_path.stat().st_mtime < COMMITS_CACHE_TTL:
+            return json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        pass
+    
+    # Past the TTL, revalidate: a 304 has no body and doesn't count against the rate limit
     try:
-        with urllib.request.urlopen(url) as response:
-            commits = json.loads(response.read().decode('utf-8'))
-            return commits
+        return json_loads(get_cached(url, cache_path)[0])
     except Exception as e:
         print(f"Error fetching commits: {e}")
         return []
 
+def readme_cache_path(sha: str) -> Path:
+    """Disk cache location for the README at a commit"""
+    return CACHE_DIR / f"readme-{sha}.md.gz"
+
+def read_cached_readme(sha: str):
+    """Return the disk-cached README at a commit, or None"""
+    try:
+        with gzip.open(readme_cache_path(sha), 'rt', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, EOFError):
+        return None
+
+def disk_cached_readme(fetch):
+    """Cache README text per commit SHA on disk; a commit's contents never change"""
+    @functools.wraps(fetch)
+    def wrapper(sha: str):
+        text = read_cached_readme(sha)
+        if text is not None:
+            return text
+        
+        text = fetch(sha)
+        if text is not None:
+            write_cache_file(readme_cache_path(sha), text, compress=True)
+        return text
+    return wrapper
+
+@functools.lru_cache(maxsize=512)
+@disk_cached_readme
 def get_readme_at_commit(sha: str):
     """Get README content at a specific commit"""
+    # The raw host serves the file directly: no base64/JSON wrapping, no API quota
+    url = f"{RAW_BASE_URL}/{sha}/{README_PATH}"
+    try:
+        return http_get(url)[1].decode('utf-8')
+    except HTTPStatusError as e:
+        if e.code != 404:
+            print(f"Error fetching README at commit {sha}: {e}")
+            return None
+    except Exception as e:
+        print(f"Error fetching README at commit {sha}: {e}")
+        return None
+    
+    return get_readme_from_contents_api(sha)
+
+def get_readme_from_contents_api(sha: str):
+    """Get README content at a specific commit via the Contents API"""
     url = f"{GITHUB_API_BASE}/contents/{README_PATH}?ref={sha}"
     try:
-        with urllib.request.urlopen(url) as response:
-            content = json.loads(response.read().decode('utf-8'))
-            import base64
-            return base64.b64decode(content['content']).decode('utf-8')
+        content = json_loads(http_get(url)[1])
+        return base64.b64decode(content['content']).decode('utf-8')
     except Exception as e:
         print(f"Error fetching README at commit {sha}: {e}")
         return None
 
+def get_readmes_graphql(shas: List[str]):
+    """Fetch the README at several commits in one GraphQL request
+    
+    Returns {sha: text} for every blob GitHub returned in full, or None if
+    the query failed. Needs GITHUB_TOKEN; GraphQL has no anonymous access.
+    """
+    fields = ''.join(
+        f'm{i}: object(expression: "{sha}:{README_PATH}") {{ ... on Blob {{ text isTruncated }} }} '
+        for i, sha in enumerate(shas)
+    )
+    query = f'query {{ repository(owner: "filecoin-project", name: "FIPs") {{ {fields}}} }}'
+    headers = {'Authorization': f"bearer {GITHUB_TOKEN}", 'Content-Type': 'application/json'}
+    try:
+        _, raw = http_request('POST', GRAPHQL_URL, headers, json.dumps({'query': query}).encode('utf-8'))
+        result = json_loads(raw)
+    except Exception as e:
+        print(f"Error fetching READMEs via GraphQL: {e}")
+        return None
+    if result.get('errors') or not result.get('data'):
+        errors = result.get('errors') or [{}]
+        print(f"GraphQL error: {errors[0].get('message', 'no data returned')}")
+        return None
+    
+    repository = result['data']['repository'] or {}
+    texts = {}
+    for i, sha in enumerate(shas):
+        blob = repository.get(f"m{i}")
+        # Large blobs come back truncated; leave those to the REST path
+        if blob and blob.get('text') is not None and not blob.get('isTruncated'):
+            texts[sha] = blob['text']
+    return texts
+
+def patch_touches_fip_table(patch: str) -> bool:
+    """Whether a unified diff adds or removes a FIP table row"""
+    for line in patch.splitlines():
+        if line[:1] in ('+', '-') and not line.startswith(('+++', '---')):
+            if line[1:].startswith(FIP_TABLE_MARKERS):
+                return True
+    return False
+
+def fip_table_changed(base: str, head: str) -> bool:
+    """Whether the README's FIP table differs between two commits
+    
+    Decided from the compare API's patch and cached on disk, since the
+    answer for a pair of commits never changes. Errs towards True.
+    """
+    cache_path = CACHE_DIR / f"table-changed-{base[:12]}-{head[:12]}"
+    try:
+        return cache_path.read_text(encoding='utf-8') == '1'
+    except OSError:
+        pass
+    
+    url = f"{GITHUB_API_BASE}/compare/{base}...{head}"
+    try:
+        headers = {'Accept': 'application/vnd.github+json'}
+        if GITHUB_TOKEN:
+            headers['Authorization'] = f"Bearer {GITHUB_TOKEN}"
+        comparison = json_loads(http_get(url, headers)[1])
+    except Exception as e:
+        print(f"Error comparing {base[:7]}...{head[:7]}: {e}")
+        return True
+    
+    files = comparison.get('files') or []
+    readme = next((f for f in files if f.get('filename') == README_PATH), None)
+    if readme is None:
+        # The file list stops at 300 entries, so only trust an absence below that
+        changed = len(files) >= COMPARE_FILES_LIMIT
+    else:
+        # Very large diffs come without a patch
+        changed = 'patch' not in readme or patch_touches_fip_table(readme['patch'])
+    write_cache_file(cache_path, '1' if changed else '0')
+    return changed
+
 def parse_fips_from_text(text: str):
-    """Parse FIPs from README text"""
-    fips = {}
-    lines = text.split('\n')
+    """Parse FIPs from README text
     
-    in_table = False
-    header_found = False
+    Returns parallel columns keyed by FIP number, so snapshots can be diffed
+    with set operations: {'numbers': frozenset, 'status': {num: status},
+    'title': {num: title}, 'title60'/'title50': {num: truncated, escaped title}}.
+    """
+    numbers = []
+    statuses = {}
+    titles = {}
+    titles60 = {}
+    titles50 = {}
     
-    for line in lines:
-        if '| FIP #' in line and 'Status' in line:
-            header_found = True
-            in_table = True
-            continue
-        
-        if header_found and re.match(r'^\|[\s\-|:]+$', line):
-            continue
-        
-        if in_table and line.startswith('| ['):
-            parts = [p.strip() for p in line.split('|') if p.strip()]
+    region = find_fip_table(text)
+    if region is not None:
+        for match in FIP_ROW_RE.finditer(text, *region):
+            number, title, fip_type, _authors, status = (g.strip() for g in match.groups())
             
-            if len(parts) >= 5:
-                fip_match = re.search(r'\[(\d+)\]', parts[0])
-                if fip_match:
-                    number = fip_match.group(1)
-                    fip_type = parts[2] if len(parts) > 2 else 'FIP'
-                    
-                    # Only track FIPs, not FRCs
-                    if fip_type.strip().upper() == 'FIP':
-                        title = parts[1] if len(parts) > 1 else ''
-                        status = parts[4] if len(parts) > 4 else ''
-                        
-                        # Clean up status
-                        if 'Superseded' in status:
-                            status = 'Superseded'
-                        else:
-                            status = status.strip()
-                        
-                        fips[number.zfill(4)] = {
-                            'number': number.zfill(4),
-                            'title': title,
-                            'status': status
-                        }
+            # Only track FIPs, not FRCs
+            if fip_type.upper() != 'FIP':
+                continue
+            
+            # Clean up status
+            if 'Superseded' in status:
+                status = 'Superseded'
+            
+            number = number.zfill(4)
+            numbers.append(number)
+            statuses[number] = status
+            titles[number] = title
+            # Truncated and escaped once here, since a title is rendered in every month it changes
+            titles60[number] = html.escape(title[:60])
+            titles50[number] = html.escape(title[:50])
+    
+    return {
+        'numbers': frozenset(numbers),
+        'status': statuses,
+        'title': titles,
+        'title60': titles60,
+        'title50': titles50
+    }
+
+# Parsed FIP tables keyed by a BLAKE2b digest of the README they came from
+PARSED_README_CACHE = {}
+
+def parse_fips_cached(text: str):
+    """parse_fips_from_text() memoized by content hash, so identical READMEs parse once
     
+    The result is shared between callers, hence the read-only mappings.
+    """
+    key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    fips = PARSED_README_CACHE.get(key)
+    if fips is None:
+        parsed = parse_fips_from_text(text)
+        fips = types.MappingProxyType({
+            column: values if isinstance(values, frozenset) else types.MappingProxyType(values)
+            for column, values in parsed.items()
+        })
+        PARSED_README_CACHE[key] = fips
     return fips
 
 def get_monthly_snapshots():
     """Get monthly snapshots of FIP statuses"""
     # Get commits from the last 12 months
-    since_date = (datetime.now() - timedelta(days=365)).isoformat()
+    # Day granularity keeps the commits cache key stable across runs on the same day
+    since_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
     commits = fetch_commits_since_date(since_date)
     
     if not commits:
         print("No commits found, fetching current version...")
         # Fallback: just get current version
         try:
-            with urllib.request.urlopen(f"https://raw.githubusercontent.com/filecoin-project/FIPs/master/{README_PATH}") as response:
-                text = response.read().decode('utf-8')
-                fips = parse_fips_from_text(text)
-                return {datetime.now().strftime('%Y-%m'): fips}
+            text = http_get(f"{RAW_BASE_URL}/master/{README_PATH}")[1].decode('utf-8')
+            fips = parse_fips_cached(text)
+            return {
+                datetime.now().strftime('%Y-%m'): {
+                    'fips': fips,
+                    'date': datetime.now(),
+                    'commit': 'HEAD'
+                }
+            }
         except Exception as e:
             print(f"Error: {e}")
             return {}
     
-    # Group commits by month
-    monthly_commits = defaultdict(list)
+    # GitHub lists commits newest first, so the first one seen per month is its latest
+    latest_by_month = {}
     for commit in commits:
-        commit_date = datetime.fromisoformat(commit['commit']['committer']['date'].replace('Z', '+00:00'))
-        month_key = commit_date.strftime('%Y-%m')
-        monthly_commits[month_key].append({
-            'sha': commit['sha'],
-            'date': commit_date,
-            'message': commit['commit']['message']
-        })
+        committed_at = commit['commit']['committer']['date']
+        month_key = committed_at[:7]
+        if month_key not in latest_by_month:
+            latest_by_month[month_key] = {
+                'sha': commit['sha'],
+                'date': parse_github_timestamp(committed_at)
+            }
+    latest = sorted(latest_by_month.items())
+    
+    # A month whose diff from the previous month leaves the table alone reuses that snapshot.
+    # Compare calls count against the API quota, so only ask about READMEs not already on disk
+    pairs = [
+        (month, prev['sha'], c['sha'])
+        for (_, prev), (month, c) in zip(latest, latest[1:])
+        if read_cached_readme(c['sha']) is None
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        table_changed = list(executor.map(
+            fip_table_changed,
+            [base for _, base, _ in pairs],
+            [head for _, _, head in pairs]
+        ))
+    unchanged_months = {month for (month, _, _), changed in zip(pairs, table_changed) if not changed}
+    to_fetch = [(month, c) for month, c in latest if month not in unchanged_months]
+    if unchanged_months:
+        print(f"FIP table unchanged in {len(unchanged_months)} month(s), reusing earlier snapshots")
     
-    # For each month, get the latest commit's README
+    # With a token, pull every uncached README in one GraphQL round-trip
+    prefetched = {}
+    if GITHUB_TOKEN:
+        missing = [c['sha'] for _, c in to_fetch if read_cached_readme(c['sha']) is None]
+        if missing:
+            print(f"Fetching {len(missing)} snapshot(s) via GraphQL...")
+            prefetched = get_readmes_graphql(missing) or {}
+            for sha, text in prefetched.items():
+                write_cache_file(readme_cache_path(sha), text, compress=True)
+    
+    # Fetch the rest concurrently over REST; the requests are independent
     monthly_snapshots = {}
-    for month, month_commits in sorted(monthly_commits.items()):
-        # Use the latest commit of the month
-        latest_commit = max(month_commits, key=lambda x: x['date'])
-        print(f"Fetching snapshot for {month} (commit {latest_commit['sha'][:7]})...")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        for month, latest_commit in to_fetch:
+            sha = latest_commit['sha']
+            if sha not in prefetched:
+                print(f"Fetching snapshot for {month} (commit {sha[:7]})...")
+            futures[executor.submit(get_readme_at_commit, sha)] = (month, latest_commit)
         
-        readme_text = get_readme_at_commit(latest_commit['sha'])
-        if readme_text:
-            fips = parse_fips_from_text(readme_text)
+        for future in as_completed(futures):
+            month, latest_commit = futures[future]
+            readme_text = future.result()
+            if readme_text:
+                fips = parse_fips_cached(readme_text)
+                monthly_snapshots[month] = {
+                    'fips': fips,
+                    'date': latest_commit['date'],
+                    'commit': latest_commit['sha'][:7]
+                }
+    
+    # Fill skipped months forward from the snapshot before them
+    previous = None
+    for month, latest_commit in latest:
+        if month in unchanged_months and previous is not None:
             monthly_snapshots[month] = {
-                'fips': fips,
+                'fips': previous['fips'],
                 'date': latest_commit['date'],
                 'commit': latest_commit['sha'][:7]
             }
+        previous = monthly_snapshots.get(month)
     
     # Also get current version
     try:
-        with urllib.request.urlopen(f"https://raw.githubusercontent.com/filecoin-project/FIPs/master/{README_PATH}") as response:
-            text = response.read().decode('utf-8')
-            fips = parse_fips_from_text(text)
-            current_month = datetime.now().strftime('%Y-%m')
-            if current_month not in monthly_snapshots:
-                monthly_snapshots[current_month] = {
-                    'fips': fips,
-                    'date': datetime.now(),
-                    'commit': 'HEAD'
-                }
+        text = http_get(f"{RAW_BASE_URL}/master/{README_PATH}")[1].decode('utf-8')
+        fips = parse_fips_cached(text)
+        current_month = datetime.now().strftime('%Y-%m')
+        if current_month not in monthly_snapshots:
+            monthly_snapshots[current_month] = {
+                'fips': fips,
+                'date': datetime.now(),
+                'commit': 'HEAD'
+            }
     except Exception as e:
         print(f"Error fetching current version: {e}")
     
@@ -162,213 +393,127 @@ def track_status_changes(monthly_snapshots: Dict):
         prev_month = sorted_months[i-1]
         prev_fips = monthly_snapshots[prev_month]['fips']
         
+        # Set algebra over the FIP number columns does the diffing in C
+        numbers, prev_numbers = fips['numbers'], prev_fips['numbers']
+        status, prev_status = fips['status'], prev_fips['status']
+        
         month_changes = {
             'month': month,
             'date': monthly_snapshots[month]['date'],
-            'new_fips': [],
-            'status_changes': [],
-            'removed_fips': []
+            'new_fips': [
+                {'number': num, 'title': fips['title'][num], 'title60': fips['title60'][num], 'status': status[num]}
+                for num in sorted(numbers - prev_numbers)
+            ],
+            'status_changes': [
+                {'number': num, 'title': fips['title'][num], 'title50': fips['title50'][num],
+                 'from': prev_status[num], 'to': status[num]}
+                for num in sorted(numbers & prev_numbers)
+                if status[num] != prev_status[num]
+            ],
+            # Removed FIPs shouldn't happen, but track anyway
+            'removed_fips': [
+                {'number': num, 'title': prev_fips['title'][num], 'title60': prev_fips['title60'][num], 'status': prev_status[num]}
+                for num in sorted(prev_numbers - numbers)
+            ]
         }
         
-        # Check for new FIPs
-        for fip_num, fip_data in fips.items():
-            if fip_num not in prev_fips:
-                month_changes['new_fips'].append({
-                    'number': fip_num,
-                    'title': fip_data['title'],
-                    'status': fip_data['status']
-                })
-            elif prev_fips[fip_num]['status'] != fip_data['status']:
-                month_changes['status_changes'].append({
-                    'number': fip_num,
-                    'title': fip_data['title'],
-                    'from': prev_fips[fip_num]['status'],
-                    'to': fip_data['status']
-                })
-        
-        # Check for removed FIPs (shouldn't happen, but track anyway)
-        for fip_num in prev_fips:
-            if fip_num not in fips:
-                month_changes['removed_fips'].append({
-                    'number': fip_num,
-                    'title': prev_fips[fip_num]['title'],
-                    'status': prev_fips[fip_num]['status']
-                })
-        
         if month_changes['new_fips'] or month_changes['status_changes'] or month_changes['removed_fips']:
             changes.append(month_changes)
     
     return changes, sorted_months
 
-def generate_timeline_html(monthly_snapshots: Dict, changes: List, sorted_months: List):
-    """Generate HTML dashboard with timeline view"""
-    
-    # Generate timeline HTML
-    timeline_html = []
-    for change in changes:
-        month_date = change['date'].strftime('%B %Y') if isinstance(change['date'], datetime) else change['month']
-        
-        change_items = []
-        
-        if change['new_fips']:
-            for fip in change['new_fips']:
-                change_items.append(f'''
-                    <div class="change-item new">
-                        <span class="change-icon">➕</span>
-                        <span class="change-text">
-                            <strong>New:</strong> <a href="https://github.com/filecoin-project/FIPs/blob/master/FIPS/fip-{fip['number']}.md" target="_blank">FIP-{fip['number']}</a> - {fip['title'][:60]}...
-                            <span class="status-badge {get_status_class(fip['status'])}">{fip['status']}</span>
-                        </span>
-                    </div>''')
-        
-        if change['status_changes']:
-            for fip in change['status_changes']:
-                change_items.append(f'''
-                    <div class="change-item status-change">
-                        <span class="change-icon">🔄</span>
-                        <span class="change-text">
-                            <strong>Status Change:</strong> <a href="https://github.com/filecoin-project/FIPs/blob/master/FIPS/fip-{fip['number']}.md" target="_blank">FIP-{fip['number']}</a> - {fip['title'][:50]}...
-                            <span class="status-change-arrow">{fip['from']} → {fip['to']}</span>
-                        </span>
-                    </div>''')
-        
-        if change['removed_fips']:
-            for fip in change['removed_fips']:
-                change_items.append(f'''
-                    <div class="change-item removed">
-                        <span class="change-icon">➖</span>
-                        <span class="change-text">
-                            <strong>Removed:</strong> FIP-{fip['number']} - {fip['title'][:60]}...
-                        </span>
-                    </div>''')
-        
-        if change_items:
-            timeline_html.append(f'''
-                <div class="timeline-month">
-                    <div class="timeline-header">
-                        <h3>{month_date}</h3>
-                        <span class="change-count">{len(change['new_fips']) + len(change['status_changes']) + len(change['removed_fips'])} changes</span>
-                    </div>
-                    <div class="timeline-changes">
-                        {''.join(change_items)}
-                    </div>
-                </div>''')
-    
-    # Generate current status summary
-    current_month = sorted_months[-1] if sorted_months else datetime.now().strftime('%Y-%m')
-    current_fips = monthly_snapshots[current_month]['fips'] if current_month in monthly_snapshots else {}
-    
-    status_summary = defaultdict(int)
-    for fip in current_fips.values():
-        status_summary[fip['status']] += 1
-    
-    summary_html = '<div class="status-summary-grid">'
-    for status, count in sorted(status_summary.items(), key=lambda x: x[1], reverse=True):
-        summary_html += f'''
-            <div class="summary-card">
-                <div class="summary-status {get_status_class(status)}">{status}</div>
-                <div class="summary-count">{count}</div>
-            </div>'''
-    summary_html += '</div>'
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>FIP Status Timeline Tracker</title>
-    <style>
-        * {{
+# Static stylesheet, kept out of the page f-string so it isn't re-formatted on every run
+TIMELINE_CSS = '''        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
             overflow: hidden;
-        }}
+        }
 
-        .header {{
+        .header {
             background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
             color: white;
             padding: 30px;
             text-align: center;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
-        }}
+        }
 
-        .header p {{
+        .header p {
             opacity: 0.9;
             font-size: 1.1em;
-        }}
+        }
 
-        .content {{
+        .content {
             padding: 30px;
-        }}
+        }
 
-        .section {{
+        .section {
             margin-bottom: 40px;
-        }}
+        }
 
-        .section h2 {{
+        .section h2 {
             color: #333;
             margin-bottom: 20px;
             font-size: 1.8em;
             border-bottom: 3px solid #667eea;
             padding-bottom: 10px;
-        }}
+        }
 
-        .status-summary-grid {{
+        .status-summary-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
             gap: 15px;
             margin-bottom: 30px;
-        }}
+        }
 
-        .summary-card {{
+        .summary-card {
             background: #f8f9fa;
             padding: 15px;
             border-radius: 8px;
             text-align: center;
             border: 2px solid #e0e0e0;
-        }}
+        }
 
-        .summary-status {{
+        .summary-status {
             font-size: 0.85em;
             font-weight: 600;
             margin-bottom: 8px;
             padding: 4px 8px;
             border-radius: 4px;
             display: inline-block;
-        }}
+        }
 
-        .summary-count {{
+        .summary-count {
             font-size: 2em;
             font-weight: 700;
             color: #667eea;
-        }}
+        }
 
-        .timeline {{
+        .timeline {
             position: relative;
             padding-left: 30px;
-        }}
+        }
 
-        .timeline::before {{
+        .timeline::before {
             content: '';
             position: absolute;
             left: 10px;
@@ -376,15 +521,15 @@ def generate_timeline_html(monthly_snapshots: Dict, changes: List, sorted_months
             bottom: 0;
             width: 2px;
             background: #667eea;
-        }}
+        }
 
-        .timeline-month {{
+        .timeline-month {
             position: relative;
             margin-bottom: 30px;
             padding-left: 30px;
-        }}
+        }
 
-        .timeline-month::before {{
+        .timeline-month::before {
             content: '';
             position: absolute;
             left: 2px;
@@ -395,98 +540,98 @@ def generate_timeline_html(monthly_snapshots: Dict, changes: List, sorted_months
             background: #667eea;
             border: 3px solid white;
             box-shadow: 0 0 0 2px #667eea;
-        }}
+        }
 
-        .timeline-header {{
+        .timeline-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 15px;
-        }}
+        }
 
-        .timeline-header h3 {{
+        .timeline-header h3 {
             color: #333;
             font-size: 1.4em;
-        }}
+        }
 
-        .change-count {{
+        .change-count {
             background: #667eea;
             color: white;
             padding: 4px 12px;
             border-radius: 12px;
             font-size: 0.9em;
             font-weight: 600;
-        }}
+        }
 
-        .timeline-changes {{
+        .timeline-changes {
             background: #f8f9fa;
             border-radius: 8px;
             padding: 15px;
-        }}
+        }
 
-        .change-item {{
+        .change-item {
             padding: 10px;
             margin-bottom: 8px;
             border-radius: 6px;
             display: flex;
             align-items: flex-start;
             gap: 10px;
-        }}
+        }
 
-        .change-item.new {{
+        .change-item.new {
             background: #d4edda;
             border-left: 4px solid #28a745;
-        }}
+        }
 
-        .change-item.status-change {{
+        .change-item.status-change {
             background: #fff3cd;
             border-left: 4px solid #ffc107;
-        }}
+        }
 
-        .change-item.removed {{
+        .change-item.removed {
             background: #f8d7da;
             border-left: 4px solid #dc3545;
-        }}
+        }
 
-        .change-icon {{
+        .change-icon {
             font-size: 1.2em;
-        }}
+        }
 
-        .change-text {{
+        .change-text {
             flex: 1;
             line-height: 1.6;
-        }}
+        }
 
-        .change-text a {{
+        .change-text a {
             color: #667eea;
             text-decoration: none;
             font-weight: 600;
-        }}
+        }
 
-        .change-text a:hover {{
+        .change-text a:hover {
             text-decoration: underline;
-        }}
+        }
 
-        .status-badge {{
+        .status-badge {
             display: inline-block;
             padding: 4px 8px;
             border-radius: 12px;
             font-size: 0.75em;
             font-weight: 600;
             margin-left: 8px;
-        }}
-
-        .status-final {{ background: #d4edda; color: #155724; }}
-        .status-draft {{ background: #fff3cd; color: #856404; }}
-        .status-accepted {{ background: #cce5ff; color: #004085; }}
-        .status-deferred {{ background: #ffeaa7; color: #856404; }}
-        .status-rejected {{ background: #f8d7da; color: #721c24; }}
-        .status-withdrawn {{ background: #e2e3e5; color: #383d41; }}
-        .status-active {{ background: #d1ecf1; color: #0c5460; }}
-        .status-last-call {{ background: #f0ad4e; color: #fff; }}
-        .status-superseded {{ background: #e7e7e7; color: #555; }}
-
-        .status-change-arrow {{
+        }
+
+        .status-final { background: #d4edda; color: #155724; }
+        .status-draft { background: #fff3cd; color: #856404; }
+        .status-accepted { background: #cce5ff; color: #004085; }
+        .status-deferred { background: #ffeaa7; color: #856404; }
+        .status-rejected { background: #f8d7da; color: #721c24; }
+        .status-withdrawn { background: #e2e3e5; color: #383d41; }
+        .status-active { background: #d1ecf1; color: #0c5460; }
+        .status-last-call { background: #f0ad4e; color: #fff; }
+        .status-superseded { background: #e7e7e7; color: #555; }
+
+        .status-change-arrow {
             display: inline-block;
             margin-left: 8px;
             padding: 2px 8px;
@@ -494,22 +639,32 @@ def generate_timeline_html(monthly_snapshots: Dict, changes: List, sorted_months
             border-radius: 4px;
             font-size: 0.85em;
             font-weight: 600;
-        }}
+        }
 
-        .no-changes {{
+        .no-changes {
             text-align: center;
             padding: 40px;
             color: #666;
             font-style: italic;
-        }}
+        }
 
-        .last-updated {{
+        .last-updated {
             text-align: center;
             padding: 20px;
             color: #666;
             font-size: 0.9em;
-        }}
-    </style>
+        }
+'''
+
+# Page shell around the generated sections; plain strings, so no brace escaping or f-string work
+HTML_PREFIX = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>FIP Status Timeline Tracker</title>
+    <style>
+''' + TIMELINE_CSS + '''    </style>
 </head>
 <body>
     <div class="container">
@@ -521,48 +676,121 @@ def generate_timeline_html(monthly_snapshots: Dict, changes: List, sorted_months
         <div class="content">
             <div class="section">
                 <h2>Current Status Summary</h2>
-                {summary_html}
+                '''
+
+HTML_MIDDLE = '''
             </div>
 
             <div class="section">
                 <h2>Status Changes Timeline</h2>
                 <div class="timeline">
-                    {''.join(timeline_html) if timeline_html else '<div class="no-changes">No status changes tracked yet. Historical data will appear here as FIPs change status over time.</div>'}
+                    '''
+
+NO_CHANGES_HTML = '<div class="no-changes">No status changes tracked yet. Historical data will appear here as FIPs change status over time.</div>'
+
+HTML_SUFFIX = '''
                 </div>
             </div>
         </div>
 
         <div class="last-updated">
-            Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            Last changed: {last_changed}
         </div>
     </div>
 </body>
 </html>'''
+
+def generate_timeline_html(monthly_snapshots: Dict, changes: List, sorted_months: List, out: TextIO):
+    """Write the HTML dashboard with timeline view to out, fragment by fragment"""
+    write = out.write
+    write(HTML_PREFIX)
+    
+    # Generate current status summary
+    current_month = sorted_months[-1] if sorted_months else datetime.now().strftime('%Y-%m')
+    current_statuses = monthly_snapshots[current_month]['fips']['status'] if current_month in monthly_snapshots else {}
+    
+    status_summary = defaultdict(int)
+    for status in current_statuses.values():
+        status_summary[status] += 1
+    
+    write('<div class="status-summary-grid">')
+    for status, count in sorted(status_summary.items(), key=lambda x: x[1], reverse=True):
+        write(f'''
+            <div class="summary-card">
+                <div class="summary-status {get_status_class(status)}">{status}</div>
+                <div class="summary-count">{count}</div>
+            </div>''')
+    write('</div>')
+    write(HTML_MIDDLE)
+    
+    # Generate timeline HTML
+    wrote_timeline = False
+    for change in changes:
+        change_count = len(change['new_fips']) + len(change['status_changes']) + len(change['removed_fips'])
+        if not change_count:
+            continue
+        
+        wrote_timeline = True
+        month_date = change['date'].strftime('%B %Y') if isinstance(change['date'], datetime) else change['month']
+        write(f'''
+                <div class="timeline-month">
+                    <div class="timeline-header">
+                        <h3>{month_date}</h3>
+                        <span class="change-count">{change_count} changes</span>
+                    </div>
+                    <div class="timeline-changes">
+                        ''')
+        
+        for fip in change['new_fips']:
+            write(f'''
+                    <div class="change-item new">
+                        <span class="change-icon">➕</span>
+                        <span class="change-text">
+                            <strong>New:</strong> <a href="https://github.com/filecoin-project/FIPs/blob/master/FIPS/fip-{fip['number']}.md" target="_blank">FIP-{fip['number']}</a> - {fip['title60']}...
+                            <span class="status-badge {get_status_class(fip['status'])}">{fip['status']}</span>
+                        </span>
+                    </div>''')
+        
+        for fip in change['status_changes']:
+            write(f'''
+                    <div class="change-item status-change">
+                        <span class="change-icon">🔄</span>
+                        <span class="change-text">
+                            <strong>Status Change:</strong> <a href="https://github.com/filecoin-project/FIPs/blob/master/FIPS/fip-{fip['number']}.md" target="_blank">FIP-{fip['number']}</a> - {fip['title50']}...
+                            <span class="status-change-arrow">{fip['from']} → {fip['to']}</span>
+                        </span>
+                    </div>''')
+        
+        for fip in change['removed_fips']:
+            write(f'''
+                    <div class="change-item removed">
+                        <span class="change-icon">➖</span>
+                        <span class="change-text">
+                            <strong>Removed:</strong> FIP-{fip['number']} - {fip['title60']}...
+                        </span>
+                    </div>''')
+        
+        write('''
+                    </div>
+                </div>''')
+    if not wrote_timeline:
+        write(NO_CHANGES_HTML)
     
-    return html
-
-def get_status_class(status):
-    """Get CSS class for status"""
-    status_lower = status.lower()
-    if 'final' in status_lower:
-        return 'status-final'
-    elif 'draft' in status_lower:
-        return 'status-draft'
-    elif 'accepted' in status_lower:
-        return 'status-accepted'
-    elif 'deferred' in status_lower:
-        return 'status-deferred'
-    elif 'rejected' in status_lower:
-        return 'status-rejected'
-    elif 'withdrawn' in status_lower:
-        return 'status-withdrawn'
-    elif 'active' in status_lower:
-        return 'status-active'
-    elif 'last call' in status_lower:
-        return 'status-last-call'
-    elif 'superseded' in status_lower:
-        return 'status-superseded'
-    return 'status-draft'
+    write(HTML_SUFFIX.format(last_changed=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+def digest_value(value):
+    """JSON form of snapshot values for page_digest(); dates only as precisely as they're shown"""
+    if isinstance(value, datetime):
+        return value.strftime('%B %Y')
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return dict(value)
+
+def timeline_digest(monthly_snapshots: Dict, changes: List, sorted_months: List):
+    """Digest of everything generate_timeline_html() renders, plus this script"""
+    current_month = sorted_months[-1] if sorted_months else None
+    current_statuses = monthly_snapshots[current_month]['fips']['status'] if current_month in monthly_snapshots else {}
+    return page_digest(__file__, {'statuses': current_statuses, 'changes': changes}, default=digest_value)
 
 def main():
     print("Fetching monthly snapshots from GitHub...")
@@ -579,12 +807,19 @@ def main():
     
     print(f"Found {len(changes)} months with changes")
     
-    print("Generating timeline HTML...")
-    html = generate_timeline_html(monthly_snapshots, changes, sorted_months)
+    output_file = OUTPUT_FILE
+    digest = timeline_digest(monthly_snapshots, changes, sorted_months)
+    if page_unchanged(output_file, digest):
+        print(f"FIP statuses unchanged, keeping {output_file}")
+        return
     
-    output_file = 'fips-timeline-tracker.html'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    print("Generating timeline HTML...")
+    # Stream into a temporary file so a failed run never leaves a truncated page
+    tmp_path = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        generate_timeline_html(monthly_snapshots, changes, sorted_months, f)
+    os.replace(tmp_path, output_file)
+    write_atomic(HASH_FILE, digest + '\n')
     
     print(f"Timeline tracker generated successfully: {output_file}")
     print(f"Open {output_file} in your browser to view the timeline")
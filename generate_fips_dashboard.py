@@ -3,21 +3,31 @@
 Script to generate a static FIPs dashboard HTML file
 """
 
-import urllib.request
+import html
 import json
 import re
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+
+from github_http import (FIP_NUMBER_RE, FIP_ROW_RE, GITHUB_API_BASE, GITHUB_TOKEN, GRAPHQL_URL,
+                         find_fip_table, get_cached, get_status_class, http_request, json_loads,
+                         page_digest, page_unchanged, write_atomic)
 
 FIPS_REPO_URL = 'https://raw.githubusercontent.com/filecoin-project/FIPs/master/README.md'
 FIPS_BASE_URL = 'https://github.com/filecoin-project/FIPs/blob/master/'
-GITHUB_API_BASE = 'https://api.github.com/repos/filecoin-project/FIPs'
+CACHE_DIR = Path.home() / '.cache' / 'fips-dashboard'
+MAX_WORKERS = 8
+LAST_PAGE_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+OUTPUT_FILE = 'fips-dashboard-static.html'
+HASH_FILE = OUTPUT_FILE + '.hash'
 
 def fetch_readme():
     """Fetch the README from GitHub"""
     try:
-        with urllib.request.urlopen(FIPS_REPO_URL) as response:
-            return response.read().decode('utf-8')
+        return get_cached(FIPS_REPO_URL, CACHE_DIR / 'README.md')[0].decode('utf-8')
     except Exception as e:
         print(f"Error fetching README: {e}")
         return None
@@ -25,83 +35,122 @@ def fetch_readme():
 def parse_fips(text):
     """Parse FIPs from the README markdown"""
     fips = []
-    lines = text.split('\n')
     
-    in_table = False
-    header_found = False
+    # One regex pass over everything after the header; separator rows never match
+    region = find_fip_table(text)
+    if region is None:
+        return fips
     
-    for line in lines:
-        # Check if this is the header row
-        if '| FIP #' in line and 'Status' in line:
-            header_found = True
-            in_table = True
-            continue
+    for match in FIP_ROW_RE.finditer(text, region[0]):
+        number, title, fip_type, authors, status = (g.strip() for g in match.groups())
         
-        # Skip separator row
-        if header_found and re.match(r'^\|[\s\-|:]+$', line):
+        # Only include FIPs, exclude FRCs
+        if fip_type.upper() != 'FIP':
             continue
         
-        # Parse table rows
-        if in_table and line.startswith('| ['):
-            parts = [p.strip() for p in line.split('|') if p.strip()]
-            
-            if len(parts) >= 5:
-                # Extract FIP number from [0001](link) format
-                fip_match = re.search(r'\[(\d+)\]', parts[0])
-                if fip_match:
-                    number = fip_match.group(1)
-                    title = parts[1] if len(parts) > 1 else ''
-                    fip_type = parts[2] if len(parts) > 2 else 'FIP'
-                    authors = parts[3] if len(parts) > 3 else ''
-                    status = parts[4] if len(parts) > 4 else ''
-                    
-                    # Clean up status
-                    if 'Superseded' in status:
-                        status = 'Superseded'
-                    else:
-                        status = status.strip()
-                    
-                    # Only include FIPs, exclude FRCs
-                    if fip_type.strip().upper() == 'FIP':
-                        fips.append({
-                            'number': number.zfill(4),
-                            'title': title,
-                            'type': fip_type,
-                            'authors': authors,
-                            'status': status
-                        })
+        # Clean up status
+        if 'Superseded' in status:
+            status = 'Superseded'
+        
+        fips.append({
+            'number': number.zfill(4),
+            'title': title,
+            # Escaped once here rather than on every render
+            'title_esc': html.escape(title),
+            'type': fip_type,
+            'authors': authors,
+            'status': status
+        })
     
     return fips
 
+def fetch_pr_page(page):
+    """Fetch one page of open pull requests; returns (prs, link_header)"""
+    url = f"{GITHUB_API_BASE}/pulls?state=open&per_page=100&page={page}"
+    # Parse the raw bytes; no separate UTF-8 decode pass
+    body, link = get_cached(url, CACHE_DIR / f'pulls-{page}.json')
+    return json_loads(body), link
+
+PRS_QUERY = """
+query($cursor: String) {
+  repository(owner: "filecoin-project", name: "FIPs") {
+    pullRequests(states: OPEN, first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { number title body headRefName url author { login } createdAt }
+    }
+  }
+}
+"""
+
+def fetch_open_prs_graphql():
+    """Fetch only the PR fields the dashboard uses; None if GraphQL fails
+    
+    Nodes are reshaped like REST /pulls items so process_prs handles either.
+    """
+    headers = {'Authorization': f"bearer {GITHUB_TOKEN}", 'Content-Type': 'application/json'}
+    prs = []
+    cursor = None
+    while True:
+        payload = json.dumps({'query': PRS_QUERY, 'variables': {'cursor': cursor}}).encode('utf-8')
+        try:
+            result = json_loads(http_request('POST', GRAPHQL_URL, headers, payload)[1])
+        except Exception as e:
+            print(f"Warning: GraphQL PR query failed: {e}")
+            return None
+        if result.get('errors') or not result.get('data'):
+            errors = result.get('errors') or [{}]
+            print(f"Warning: GraphQL PR query failed: {errors[0].get('message', 'no data returned')}")
+            return None
+        
+        page = result['data']['repository']['pullRequests']
+        for node in page['nodes']:
+            prs.append({
+                'number': node['number'],
+                'title': node['title'],
+                'body': node['body'],
+                'head': {'ref': node['headRefName']},
+                'html_url': node['url'],
+                # Deleted accounts come back as a null author
+                'user': node['author'] or {},
+                'created_at': node['createdAt']
+            })
+        if not page['pageInfo']['hasNextPage']:
+            return prs
+        cursor = page['pageInfo']['endCursor']
+
 def fetch_open_prs():
     """Fetch all open pull requests"""
-    url = f"{GITHUB_API_BASE}/pulls?state=open&per_page=100"
+    # GraphQL needs a token; without one (or on error) use the REST listing
+    prs = fetch_open_prs_graphql() if GITHUB_TOKEN else None
+    if prs is not None:
+        return prs
+    
     try:
-        with urllib.request.urlopen(url) as response:
-            prs = json.loads(response.read().decode('utf-8'))
-            return prs
+        # The first page's Link header says how many pages there are; fetch the rest at once
+        prs, link = fetch_pr_page(1)
+        last_match = LAST_PAGE_RE.search(link)
+        last_page = int(last_match.group(1)) if last_match else 1
+        if last_page > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, last_page - 1)) as executor:
+                for page_prs, _ in executor.map(fetch_pr_page, range(2, last_page + 1)):
+                    prs.extend(page_prs)
+        return prs
     except Exception as e:
         print(f"Warning: Could not fetch PRs: {e}")
         return []
 
 def extract_fip_numbers(text):
     """Extract FIP numbers from PR title, body, or branch name"""
-    fip_numbers = set()
-    patterns = [
-        r'FIP[-\s]?(\d{4})',
-        r'fip[-\s]?(\d{4})',
-        r'\[(\d{4})\]',
-        r'#(\d{4})',
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            fip_numbers.add(match.zfill(4))
-    return sorted(list(fip_numbers))
+    return sorted({match.zfill(4) for match in FIP_NUMBER_RE.findall(text)})
 
 def process_prs(prs):
-    """Process PRs and extract FIP information"""
-    fip_prs = {}
+    """Process PRs and extract FIP information
+    
+    Returns (fip_prs, prs_by_number): the PR numbers referencing each FIP, and
+    one info record per PR that references any FIP.
+    """
+    fip_prs = defaultdict(list)
+    prs_by_number = {}
     for pr in prs:
         title = pr.get('title', '')
         body = pr.get('body', '')
@@ -109,195 +158,103 @@ def process_prs(prs):
         search_text = f"{title} {body} {branch}"
         fip_numbers = extract_fip_numbers(search_text)
         
+        author = pr.get('user', {}).get('login', 'Unknown')
         pr_info = {
             'number': pr.get('number'),
             'title': title,
+            'title_esc': html.escape(title),
             'url': pr.get('html_url'),
-            'author': pr.get('user', {}).get('login', 'Unknown'),
+            'author': author,
+            'author_esc': html.escape(author),
             'created_at': pr.get('created_at', ''),
+            # GitHub timestamps are ISO-8601 UTC, so the prefix is already YYYY-MM-DD
+            'created_date': (pr.get('created_at') or '')[:10],
         }
         
+        if fip_numbers:
+            prs_by_number[pr_info['number']] = pr_info
         for fip_num in fip_numbers:
-            if fip_num not in fip_prs:
-                fip_prs[fip_num] = []
-            fip_prs[fip_num].append(pr_info)
+            fip_prs[fip_num].append(pr_info['number'])
     
-    return fip_prs
-
-def get_status_class(status):
-    """Get CSS class for status badge"""
-    status_lower = status.lower()
-    if 'final' in status_lower:
-        return 'status-final'
-    elif 'draft' in status_lower:
-        return 'status-draft'
-    elif 'accepted' in status_lower:
-        return 'status-accepted'
-    elif 'deferred' in status_lower:
-        return 'status-deferred'
-    elif 'rejected' in status_lower:
-        return 'status-rejected'
-    elif 'withdrawn' in status_lower:
-        return 'status-withdrawn'
-    elif 'active' in status_lower:
-        return 'status-active'
-    elif 'last call' in status_lower:
-        return 'status-last-call'
-    elif 'superseded' in status_lower:
-        return 'status-superseded'
-    return 'status-draft'
-
-def generate_prs_section_html(fip_prs):
+    return dict(fip_prs), prs_by_number
+
+def generate_prs_section_html(fip_prs, prs_by_number):
     """Generate HTML for PRs section"""
     if not fip_prs:
         return '<div class="no-prs">No open PRs found.</div>'
     
-    # Get all unique PRs
-    all_prs = []
-    seen_prs = set()
-    for fip_num, prs in fip_prs.items():
-        for pr in prs:
-            if pr['number'] not in seen_prs:
-                all_prs.append((fip_num, pr))
-                seen_prs.add(pr['number'])
-    
-    if not all_prs:
-        return '<div class="no-prs">No open PRs found.</div>'
-    
-    # Group by FIP
-    html = '<div class="prs-section">'
-    html += f'<h2>Open Pull Requests ({len(seen_prs)} total)</h2>'
+    # Group by FIP; prs_by_number already holds each PR once
+    parts = ['<div class="prs-section">']
+    append = parts.append
+    append(f'<h2>Open Pull Requests ({len(prs_by_number)} total)</h2>')
     
     # Sort FIPs with PRs
     sorted_fips = sorted(fip_prs.keys())
     
     for fip_num in sorted_fips:
-        prs = fip_prs[fip_num]
-        html += f'<div class="fip-pr-group">'
-        html += f'<div class="fip-pr-header"><strong>FIP-{fip_num}</strong> <span class="pr-count">({len(prs)} PR{"s" if len(prs) > 1 else ""})</span></div>'
-        html += '<div class="pr-list">'
+        prs = [prs_by_number[number] for number in fip_prs[fip_num]]
+        append('<div class="fip-pr-group">')
+        append(f'<div class="fip-pr-header"><strong>FIP-{fip_num}</strong> <span class="pr-count">({len(prs)} PR{"s" if len(prs) > 1 else ""})</span></div>')
+        append('<div class="pr-list">')
         for pr in prs:
-            created_date = datetime.fromisoformat(pr['created_at'].replace('Z', '+00:00')).strftime('%Y-%m-%d')
-            html += f'''
+            append(f'''
                 <div class="pr-item">
-                    <a href="{pr['url']}" target="_blank" class="pr-link">#{pr['number']}: {pr['title']}</a>
-                    <span class="pr-meta">By @{pr['author']} • {created_date}</span>
+                    <a href="{pr['url']}" target="_blank" class="pr-link">#{pr['number']}: {pr['title_esc']}</a>
+                    <span class="pr-meta">By @{pr['author_esc']} • {pr['created_date']}</span>
                 </div>
-            '''
-        html += '</div></div>'
+            ''')
+        append('</div></div>')
     
-    html += '</div>'
-    return html
+    append('</div>')
+    return ''.join(parts)
 
-def generate_html(fips, fip_prs=None):
-    """Generate the HTML dashboard"""
-    if fip_prs is None:
-        fip_prs = {}
-    
-    # Group FIPs by status
-    status_groups = defaultdict(list)
-    for fip in fips:
-        status = fip['status']
-        if 'Superseded' in status:
-            status = 'Superseded'
-        status_groups[status].append(fip)
-    
-    # Sort statuses by count
-    sorted_statuses = sorted(status_groups.keys(), key=lambda x: len(status_groups[x]), reverse=True)
-    
-    # Generate table rows
-    table_rows = []
-    for status in sorted_statuses:
-        fips_in_status = sorted(status_groups[status], key=lambda x: int(x['number']))
-        status_class = get_status_class(status)
-        
-        # Generate FIP links (only FIPs, no FRCs)
-        fip_links = []
-        for fip in fips_in_status:
-            fip_path = f"FIPS/fip-{fip['number']}.md"
-            url = f"{FIPS_BASE_URL}{fip_path}"
-            fip_num = fip['number']
-            
-            # Check if there are PRs for this FIP
-            pr_badges = ''
-            if fip_num in fip_prs:
-                pr_count = len(fip_prs[fip_num])
-                pr_badges = f' <span class="pr-badge-small" title="{pr_count} open PR{"s" if pr_count > 1 else ""}">🔀 {pr_count}</span>'
-            
-            fip_links.append(f'<a href="{url}" target="_blank" title="{fip["title"]}">FIP-{fip["number"]}</a>{pr_badges}')
-        
-        fip_links_html = '\n                            '.join(fip_links)
-        
-        table_rows.append(f'''
-                    <tr>
-                        <td><span class="status-badge {status_class}">{status}</span></td>
-                        <td><span class="count">{len(fips_in_status)}</span></td>
-                        <td>
-                            <div class="fips-list">
-                                {fip_links_html}
-                            </div>
-                        </td>
-                    </tr>''')
-    
-    # Calculate stats
-    total_fips = len(fips)
-    final_count = len(status_groups.get('Final', []))
-    draft_count = len(status_groups.get('Draft', []))
-    active_count = len(status_groups.get('Accepted', [])) + len(status_groups.get('Last Call', []))
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Filecoin Improvement Proposals (FIPs) Dashboard</title>
-    <style>
-        * {{
+# Static stylesheet, kept out of the page template so it is never re-formatted
+DASHBOARD_CSS = '''        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
             overflow: hidden;
-        }}
+        }
 
-        .header {{
+        .header {
             background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
             color: white;
             padding: 30px;
             text-align: center;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
-        }}
+        }
 
-        .header p {{
+        .header p {
             opacity: 0.9;
             font-size: 1.1em;
-        }}
+        }
 
-        .last-updated {{
+        .last-updated {
             margin-top: 15px;
             font-size: 0.9em;
             opacity: 0.8;
-        }}
+        }
 
-        .controls {{
+        .controls {
             padding: 20px 30px;
             background: #f8f9fa;
             border-bottom: 1px solid #e0e0e0;
@@ -306,9 +263,9 @@ def generate_html(fips, fip_prs=None):
             align-items: center;
             flex-wrap: wrap;
             gap: 15px;
-        }}
+        }
 
-        .refresh-btn {{
+        .refresh-btn {
             background: #667eea;
             color: white;
             border: none;
@@ -318,49 +275,49 @@ def generate_html(fips, fip_prs=None):
             font-size: 1em;
             font-weight: 600;
             transition: all 0.3s;
-        }}
+        }
 
-        .refresh-btn:hover {{
+        .refresh-btn:hover {
             background: #5568d3;
             transform: translateY(-2px);
             box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-        }}
+        }
 
-        .refresh-btn:active {{
+        .refresh-btn:active {
             transform: translateY(0);
-        }}
+        }
 
-        .status-table {{
+        .status-table {
             width: 100%;
             border-collapse: collapse;
             margin: 0;
-        }}
+        }
 
-        .status-table thead {{
+        .status-table thead {
             background: #f8f9fa;
-        }}
+        }
 
-        .status-table th {{
+        .status-table th {
             padding: 18px;
             text-align: left;
             font-weight: 600;
             color: #333;
             border-bottom: 2px solid #e0e0e0;
             font-size: 1.1em;
-        }}
+        }
 
-        .status-table td {{
+        .status-table td {
             padding: 18px;
             border-bottom: 1px solid #e0e0e0;
             vertical-align: top;
-        }}
+        }
 
-        .status-table tbody tr:hover {{
+        .status-table tbody tr:hover {
             background: #f8f9fa;
             transition: background 0.2s;
-        }}
+        }
 
-        .status-badge {{
+        .status-badge {
             display: inline-block;
             padding: 6px 12px;
             border-radius: 20px;
@@ -368,64 +325,64 @@ def generate_html(fips, fip_prs=None):
             font-size: 0.9em;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .status-final {{
+        .status-final {
             background: #d4edda;
             color: #155724;
-        }}
+        }
 
-        .status-draft {{
+        .status-draft {
             background: #fff3cd;
             color: #856404;
-        }}
+        }
 
-        .status-accepted {{
+        .status-accepted {
             background: #cce5ff;
             color: #004085;
-        }}
+        }
 
-        .status-deferred {{
+        .status-deferred {
             background: #ffeaa7;
             color: #856404;
-        }}
+        }
 
-        .status-rejected {{
+        .status-rejected {
             background: #f8d7da;
             color: #721c24;
-        }}
+        }
 
-        .status-withdrawn {{
+        .status-withdrawn {
             background: #e2e3e5;
             color: #383d41;
-        }}
+        }
 
-        .status-active {{
+        .status-active {
             background: #d1ecf1;
             color: #0c5460;
-        }}
+        }
 
-        .status-last-call {{
+        .status-last-call {
             background: #f0ad4e;
             color: #fff;
-        }}
+        }
 
-        .status-superseded {{
+        .status-superseded {
             background: #e7e7e7;
             color: #555;
-        }}
+        }
 
-        .count {{
+        .count {
             font-size: 1.5em;
             font-weight: 700;
             color: #333;
-        }}
+        }
 
-        .fips-list {{
+        .fips-list {
             margin-top: 10px;
-        }}
+        }
 
-        .fips-list a {{
+        .fips-list a {
             display: inline-block;
             margin: 4px 8px 4px 0;
             padding: 6px 12px;
@@ -435,45 +392,45 @@ def generate_html(fips, fip_prs=None):
             border-radius: 4px;
             font-size: 0.9em;
             transition: all 0.2s;
-        }}
+        }
 
-        .fips-list a:hover {{
+        .fips-list a:hover {
             background: #5568d3;
             transform: translateY(-1px);
             box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3);
-        }}
+        }
 
-        .stats-summary {{
+        .stats-summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             padding: 30px;
             background: #f8f9fa;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background: white;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
             text-align: center;
-        }}
+        }
 
-        .stat-card h3 {{
+        .stat-card h3 {
             color: #666;
             font-size: 0.9em;
             text-transform: uppercase;
             letter-spacing: 1px;
             margin-bottom: 10px;
-        }}
+        }
 
-        .stat-card .number {{
+        .stat-card .number {
             font-size: 2.5em;
             font-weight: 700;
             color: #667eea;
-        }}
+        }
 
-        .pr-badge-small {{
+        .pr-badge-small {
             display: inline-block;
             background: #28a745;
             color: white;
@@ -482,83 +439,95 @@ def generate_html(fips, fip_prs=None):
             border-radius: 10px;
             margin-left: 4px;
             font-weight: 600;
-        }}
+        }
 
-        .prs-section {{
+        .prs-section {
             margin-top: 40px;
             padding-top: 30px;
             border-top: 2px solid #e0e0e0;
-        }}
+        }
 
-        .prs-section h2 {{
+        .prs-section h2 {
             color: #333;
             margin-bottom: 20px;
             font-size: 1.8em;
-        }}
+        }
 
-        .fip-pr-group {{
+        .fip-pr-group {
             margin-bottom: 25px;
             background: #f8f9fa;
             border-radius: 8px;
             padding: 15px;
-        }}
+        }
 
-        .fip-pr-header {{
+        .fip-pr-header {
             font-size: 1.2em;
             margin-bottom: 12px;
             color: #333;
-        }}
+        }
 
-        .pr-count {{
+        .pr-count {
             color: #666;
             font-size: 0.9em;
             font-weight: normal;
-        }}
+        }
 
-        .pr-list {{
+        .pr-list {
             display: flex;
             flex-direction: column;
             gap: 8px;
-        }}
+        }
 
-        .pr-item {{
+        .pr-item {
             background: white;
             padding: 12px;
             border-radius: 6px;
             border-left: 3px solid #667eea;
-        }}
+        }
 
-        .pr-link {{
+        .pr-link {
             color: #667eea;
             text-decoration: none;
             font-weight: 600;
             display: block;
             margin-bottom: 4px;
-        }}
+        }
 
-        .pr-link:hover {{
+        .pr-link:hover {
             text-decoration: underline;
-        }}
+        }
 
-        .pr-meta {{
+        .pr-meta {
             color: #666;
             font-size: 0.85em;
-        }}
+        }
 
-        .no-prs {{
+        .no-prs {
             text-align: center;
             padding: 40px;
             color: #666;
             font-style: italic;
-        }}
-    </style>
+        }
+'''
+
+# Page shell around the generated sections; only BODY_TEMPLATE has format fields
+HTML_HEAD = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Filecoin Improvement Proposals (FIPs) Dashboard</title>
+    <style>
+''' + DASHBOARD_CSS + '''    </style>
 </head>
-<body>
+'''
+
+BODY_TEMPLATE = '''<body>
     <div class="container">
         <div class="header">
             <h1>📊 Filecoin Improvement Proposals Dashboard</h1>
-            <p>Real-time status tracking of all FIPs</p>
-            <div class="last-updated">Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
+            <p>Status tracking of all FIPs, checked against GitHub every six hours</p>
+            <div class="last-updated">Last changed: {last_changed}</div>
         </div>
 
         <div class="controls">
@@ -597,20 +566,104 @@ def generate_html(fips, fip_prs=None):
                 </tr>
             </thead>
             <tbody>
-{''.join(table_rows)}
+'''
+
+TABLE_END = '''
             </tbody>
         </table>
 
-        {generate_prs_section_html(fip_prs)}
+        '''
+
+HTML_END = '''
     </div>
 </body>
 </html>'''
+
+def generate_html(fips, fip_prs=None, prs_by_number=None):
+    """Generate the HTML dashboard"""
+    if fip_prs is None:
+        fip_prs = {}
+    if prs_by_number is None:
+        prs_by_number = {}
+    
+    # Group FIPs by status, counting them in the same pass. Numbers are zero-padded,
+    # so one string sort up front leaves every group in numeric order
+    status_groups = defaultdict(list)
+    status_counts = Counter()
+    for fip in sorted(fips, key=itemgetter('number')):
+        status = fip['status']
+        if 'Superseded' in status:
+            status = 'Superseded'
+        status_groups[status].append(fip)
+        status_counts[status] += 1
+    
+    # Sort statuses by count (most_common keeps first-seen order for ties)
+    sorted_statuses = [status for status, _ in status_counts.most_common()]
     
-    return html
+    # Generate table rows as one flat list of fragments, joined once below
+    table_rows = []
+    append = table_rows.append
+    for status in sorted_statuses:
+        fips_in_status = status_groups[status]
+        status_class = get_status_class(status)
+        
+        append(f'''
+                    <tr>
+                        <td><span class="status-badge {status_class}">{status}</span></td>
+                        <td><span class="count">{status_counts[status]}</span></td>
+                        <td>
+                            <div class="fips-list">
+                                ''')
+        
+        # Generate FIP links (only FIPs, no FRCs)
+        for i, fip in enumerate(fips_in_status):
+            fip_path = f"FIPS/fip-{fip['number']}.md"
+            url = f"{FIPS_BASE_URL}{fip_path}"
+            fip_num = fip['number']
+            
+            # Check if there are PRs for this FIP
+            pr_badges = ''
+            if fip_num in fip_prs:
+                pr_count = len(fip_prs[fip_num])
+                pr_badges = f' <span class="pr-badge-small" title="{pr_count} open PR{"s" if pr_count > 1 else ""}">🔀 {pr_count}</span>'
+            
+            if i:
+                append('\n                            ')
+            append(f'<a href="{url}" target="_blank" title="{fip["title_esc"]}">FIP-{fip["number"]}</a>{pr_badges}')
+        
+        append('''
+                            </div>
+                        </td>
+                    </tr>''')
+    
+    # Calculate stats
+    total_fips = len(fips)
+    final_count = status_counts['Final']
+    draft_count = status_counts['Draft']
+    active_count = status_counts['Accepted'] + status_counts['Last Call']
+    
+    body = BODY_TEMPLATE.format_map({
+        'last_changed': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total_fips': total_fips,
+        'final_count': final_count,
+        'draft_count': draft_count,
+        'active_count': active_count
+    })
+    parts = [HTML_HEAD, body]
+    parts.extend(table_rows)
+    parts.append(TABLE_END)
+    parts.append(generate_prs_section_html(fip_prs, prs_by_number))
+    parts.append(HTML_END)
+    return ''.join(parts)
 
 def main():
-    print("Fetching FIPs data from GitHub...")
-    text = fetch_readme()
+    # The README and PR list are independent downloads, so overlap them
+    print("Fetching FIPs data and open PRs from GitHub...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        readme_future = executor.submit(fetch_readme)
+        prs_future = executor.submit(fetch_open_prs)
+        text = readme_future.result()
+        prs = prs_future.result()
     
     if not text:
         print("Failed to fetch README")
@@ -620,20 +673,24 @@ def main():
     fips = parse_fips(text)
     print(f"Found {len(fips)} FIPs")
     
-    print("Fetching open PRs...")
-    prs = fetch_open_prs()
     fip_prs = {}
+    prs_by_number = {}
     if prs:
-        fip_prs = process_prs(prs)
+        fip_prs, prs_by_number = process_prs(prs)
         total_prs = sum(len(pr_list) for pr_list in fip_prs.values())
         print(f"Found {total_prs} PR(s) related to {len(fip_prs)} FIP(s)")
     
+    output_file = OUTPUT_FILE
+    digest = page_digest(__file__, {'fips': fips, 'fip_prs': fip_prs, 'prs': prs_by_number})
+    if page_unchanged(output_file, digest):
+        print(f"FIPs and PRs unchanged, keeping {output_file}")
+        return
+    
     print("Generating HTML dashboard...")
-    html = generate_html(fips, fip_prs)
+    page = generate_html(fips, fip_prs, prs_by_number)
     
-    output_file = 'fips-dashboard-static.html'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    write_atomic(output_file, page)
+    write_atomic(HASH_FILE, digest + '\n')
     
     print(f"Dashboard generated successfully: {output_file}")
     print(f"Open {output_file} in your browser to view the dashboard")
@@ -0,0 +1,242 @@
+"""
+Keep-alive HTTP client, GitHub rate-limit helpers and FIPs README parsing
+shared by the dashboard scripts
+"""
+
+import functools
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Dict
+
+try:
+    # orjson parses large GitHub payloads several times faster than stdlib json
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+GITHUB_API_BASE = 'https://api.github.com/repos/filecoin-project/FIPs'
+GRAPHQL_URL = 'https://api.github.com/graphql'
+MAX_REDIRECTS = 5
+DEFAULT_HEADERS = {'User-Agent': 'fips-dashboard', 'Accept-Encoding': 'gzip'}
+GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')
+RATE_LIMIT_FLOOR = 5  # pause once fewer than this many requests remain
+RATE_LIMIT_RETRIES = 3
+
+# Epoch time the next GitHub call has to wait for, set from the last response
+RATE_LIMIT_STATE = {'resume_at': 0.0}
+
+# Matches FIP-0001, FIP 0001, FIP0001, fip-0001, [0001] and #0001 in one pass
+FIP_NUMBER_RE = re.compile(r'(?:FIP[-\s]?|#|\[(?=\d{4}\]))(\d{4})', re.IGNORECASE)
+# README table: | FIP # | Title | Type | Author | Status |
+FIP_ROW_RE = re.compile(r'^\| \[(\d+)\][^|\n]*\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)', re.M)
+
+# Checked in order; the first keyword found in the status picks the CSS class
+STATUS_CLASSES = {
+    'final': 'status-final',
+    'draft': 'status-draft',
+    'accepted': 'status-accepted',
+    'deferred': 'status-deferred',
+    'rejected': 'status-rejected',
+    'withdrawn': 'status-withdrawn',
+    'active': 'status-active',
+    'last call': 'status-last-call',
+    'superseded': 'status-superseded',
+}
+
+class HTTPStatusError(Exception):
+    """Non-2xx response from http_request(); carries .code like urllib.error.HTTPError"""
+    def __init__(self, url: str, code: int, headers):
+        super().__init__(f"HTTP Error {code} for {url}")
+        self.code = code
+        self.headers = headers
+
+# Per-thread {(scheme, host): connection}, so each worker keeps its sockets alive
+CONNECTIONS = threading.local()
+
+def get_connection(scheme: str, host: str, fresh: bool = False):
+    """Return this thread's keep-alive connection to host"""
+    pool = CONNECTIONS.__dict__.setdefault('pool', {})
+    conn = pool.get((scheme, host))
+    if conn is None or fresh:
+        if conn is not None:
+            conn.close()
+        connection_class = http.client.HTTPConnection if scheme == 'http' else http.client.HTTPSConnection
+        conn = pool[(scheme, host)] = connection_class(host, timeout=30)
+    return conn
+
+def http_request(method: str, url: str, headers: Dict = None, body: bytes = None):
+    """Send a request over a reused keep-alive connection and return (headers, body bytes)
+    
+    urlopen() pays a new TCP + TLS handshake on every call; this keeps one
+    connection per host per thread. Raises HTTPStatusError on non-2xx.
+    """
+    request_headers = dict(DEFAULT_HEADERS, **(headers or {}))
+    for _ in range(MAX_REDIRECTS):
+        parts = urllib.parse.urlsplit(url)
+        target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        for attempt in range(2):
+            conn = get_connection(parts.scheme, parts.netloc, fresh=attempt > 0)
+            try:
+                conn.request(method, target, body=body, headers=request_headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # The server may have dropped an idle connection; retry once on a new one
+                if attempt:
+                    raise
+        
+        location = response.getheader('Location')
+        if response.status in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(url).netloc != parts.netloc:
+                # Never hand the token to another host
+                request_headers = {k: v for k, v in request_headers.items() if k.lower() != 'authorization'}
+            if response.status == 303 or (response.status in (301, 302) and method == 'POST'):
+                # Like browsers and urllib: the redirect target is fetched with a bodiless GET
+                method, body = 'GET', None
+                request_headers = {k: v for k, v in request_headers.items()
+                                   if k.lower() not in ('content-type', 'content-length')}
+            continue
+        if response.getheader('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
+        if not 200 <= response.status < 300:
+            raise HTTPStatusError(url, response.status, response.headers)
+        return response.headers, data
+    raise HTTPStatusError(url, response.status, response.headers)
+
+def http_get(url: str, headers: Dict = None):
+    """GET url and return (headers, body bytes)"""
+    return http_request('GET', url, headers)
+
+def write_atomic(path, data):
+    """Write str or bytes to path via a temporary file so readers never see a partial file"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if isinstance(data, str):
+        tmp_path.write_text(data, encoding='utf-8')
+    else:
+        tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+def page_digest(script_path, data, default=None):
+    """BLAKE2b digest of a generator script and the JSON-serialisable data its page is rendered from"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(Path(script_path).read_bytes())
+    h.update(json.dumps(data, sort_keys=True, default=default).encode('utf-8'))
+    return h.hexdigest()
+
+def page_unchanged(output_file, digest):
+    """True when output_file exists and its .hash file says it was rendered from digest"""
+    try:
+        with open(f"{output_file}.hash", encoding='utf-8') as f:
+            return f.read().strip() == digest and os.path.exists(output_file)
+    except OSError:
+        return False
+
+def get_cached(url: str, cache_path: Path, headers: Dict = None):
+    """GET url, revalidating a cached copy with If-None-Match/If-Modified-Since
+    
+    The body is kept at cache_path with its ETag, Last-Modified and Link headers
+    next to it; a 304 Not Modified answer returns the cached body without
+    re-downloading it and touches cache_path, so its mtime is when it was last
+    confirmed current. GitHub API calls send GITHUB_TOKEN when it is set.
+    Returns a (body bytes, link_header) tuple.
+    """
+    etag_path = cache_path.with_name(cache_path.name + '.etag')
+    modified_path = cache_path.with_name(cache_path.name + '.last-modified')
+    link_path = cache_path.with_name(cache_path.name + '.link')
+    
+    request_headers = dict(headers or {})
+    if url.startswith('https://api.github.com/'):
+        request_headers.setdefault('Accept', 'application/vnd.github+json')
+        if GITHUB_TOKEN:
+            request_headers.setdefault('Authorization', f"Bearer {GITHUB_TOKEN}")
+    if cache_path.exists():
+        for path, header in ((etag_path, 'If-None-Match'), (modified_path, 'If-Modified-Since')):
+            try:
+                request_headers[header] = path.read_text(encoding='utf-8').strip()
+            except OSError:
+                pass
+    
+    try:
+        response_headers, body = http_request('GET', url, request_headers)
+    except HTTPStatusError as e:
+        if e.code == 304 and cache_path.exists():
+            cache_path.touch()
+            try:
+                link = link_path.read_text(encoding='utf-8')
+            except OSError:
+                link = ''
+            return cache_path.read_bytes(), link
+        raise
+    
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(cache_path, body)
+        for path, header in ((etag_path, 'ETag'), (modified_path, 'Last-Modified'), (link_path, 'Link')):
+            if response_headers.get(header):
+                write_atomic(path, response_headers[header])
+            elif path.exists():
+                path.unlink()
+    except OSError as e:
+        print(f"Warning: Could not write cache file {cache_path}: {e}")
+    return body, response_headers.get('Link', '')
+
+def rate_limit_delay(headers):
+    """Seconds to wait before the next GitHub call, from Retry-After or X-RateLimit-*"""
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        return int(retry_after)
+    remaining = headers.get('X-RateLimit-Remaining')
+    reset = headers.get('X-RateLimit-Reset')
+    if remaining is not None and reset is not None and int(remaining) < RATE_LIMIT_FLOOR:
+        return max(0, int(reset) - time.time())
+    return 0
+
+def note_rate_limit(headers):
+    """Record the wait a response asks for and return it; wait_for_rate_limit() applies it
+    
+    The wait is deferred to the next request so a run doesn't sleep after its final call.
+    """
+    delay = rate_limit_delay(headers)
+    if delay:
+        RATE_LIMIT_STATE['resume_at'] = max(RATE_LIMIT_STATE['resume_at'], time.time() + delay)
+    return delay
+
+def wait_for_rate_limit():
+    """Sleep until the quota recorded by note_rate_limit() has reset"""
+    delay = RATE_LIMIT_STATE['resume_at'] - time.time()
+    if delay > 0:
+        print(f"GitHub rate limit nearly exhausted, waiting {delay:.0f}s...")
+        time.sleep(delay)
+
+def find_fip_table(text: str):
+    """Return (start, end) offsets of the FIP table, from its header row to the first blank line"""
+    start = text.find('| FIP #')
+    while start != -1:
+        line_end = text.find('\n', start)
+        if line_end == -1:
+            line_end = len(text)
+        if 'Status' in text[start:line_end]:
+            end = text.find('\n\n', line_end)
+            return start, end if end != -1 else len(text)
+        start = text.find('| FIP #', line_end)
+    return None
+
+@functools.lru_cache(maxsize=32)
+def get_status_class(status):
+    """Get CSS class for status"""
+    status_lower = status.lower()
+    for keyword, css_class in STATUS_CLASSES.items():
+        if keyword in status_lower:
+            return css_class
+    return 'status-draft'
@@ -1,40 +1,46 @@
 import requests
 import csv
-import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
+from github_http import json_loads
+
 # Configuration
 MINA_GRAPHQL_URL = "https://graphql.minaexplorer.com/"  # Mina Explorer GraphQL API endpoint
 OUTPUT_FILE = "mina_addresses_balances.csv"
-BATCH_SIZE = 10  # Number of records per query (reduced for stability)
+BATCH_SIZE = 100  # Number of records per page
+PAGES_PER_QUERY = 10  # Pages fetched together as aliases of one GraphQL query
+MAX_CONCURRENT_REQUESTS = 8  # Queries in flight at once, to avoid hammering the endpoint
+NANOMINA_PER_MINA = 1e9
 
-def fetch_accounts(limit: int = BATCH_SIZE, offset: int = 0, max_retries: int = 3) -> Dict:
-    """Fetch accounts from Mina GraphQL endpoint with retry logic"""
-    query = """
-    query GetAccounts($limit: Int!, $offset: Int!) {
-      staking(limit: $limit, offset: $offset) {
+def build_batched_query(start_offset: int, pages: int, page_size: int = BATCH_SIZE) -> str:
+    """Build one GraphQL document with aliased staking selections p0..p{pages-1}"""
+    selections = "\n".join(
+        f"""      p{i}: staking(limit: {page_size}, offset: {start_offset + i * page_size}) {{
         public_key
         balance
-      }
-    }
-    """
-    
-    variables = {
-        "limit": limit,
-        "offset": offset
-    }
+      }}"""
+        for i in range(pages)
+    )
+    return f"query GetAccounts {{\n{selections}\n    }}"
+
+def fetch_accounts(session: requests.Session, start_offset: int = 0, pages: int = PAGES_PER_QUERY,
+                   page_size: int = BATCH_SIZE, max_retries: int = 3) -> Dict:
+    """Fetch several pages of accounts in one aliased GraphQL query, with retry logic"""
+    query = build_batched_query(start_offset, pages, page_size)
     
     for attempt in range(max_retries):
         try:
-            response = requests.post(
+            response = session.post(
                 MINA_GRAPHQL_URL,
-                json={"query": query, "variables": variables},
+                json={"query": query},
                 timeout=60
             )
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # ValueError covers a 200 with a non-JSON body (e.g. a proxy error page)
             print(f"Error fetching accounts (attempt {attempt + 1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
                 print(f"Retrying in 5 seconds...")
@@ -46,17 +52,13 @@ def export_to_csv(all_accounts: List[Dict], filename: str):
     """Export accounts to CSV file"""
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Address', 'Balance (MINA)']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for account in all_accounts:
-                # Convert balance from nanomina to MINA (1 MINA = 1e9 nanomina)
-                balance_mina = float(account['balance']) / 1e9
-                writer.writerow({
-                    'Address': account['public_key'],
-                    'Balance (MINA)': f"{balance_mina:.9f}"
-                })
+            writer = csv.writer(csvfile)
+            writer.writerow(['Address', 'Balance (MINA)'])
+            # Convert balance from nanomina to MINA (1 MINA = 1e9 nanomina)
+            writer.writerows(
+                (account['public_key'], f"{float(account['balance']) / NANOMINA_PER_MINA:.9f}")
+                for account in all_accounts
+            )
         
         print(f"Successfully exported {len(all_accounts)} accounts to {filename}")
     except IOError as e:
@@ -69,29 +71,52 @@ def main():
     all_accounts = []
     offset = 0
     has_more = True
+    short_page_offset = None
+    truncated = False
     
-    while has_more:
-        print(f"Fetching accounts at offset {offset}...")
-        result = fetch_accounts(limit=BATCH_SIZE, offset=offset)
-        
-        if result is None or "errors" in result:
-            error_msg = result.get("errors", [{}])[0].get("message", "Unknown error") if result else "No response"
-            print(f"Error fetching data: {error_msg}")
-            break
-        
-        accounts = result.get("data", {}).get("staking", [])
-        
-        if not accounts:
-            has_more = False
-            print("Reached end of accounts")
-        else:
-            all_accounts.extend(accounts)
-            print(f"Fetched {len(accounts)} accounts (Total: {len(all_accounts)})")
-            offset += BATCH_SIZE
-            # Add a small delay between requests to be respectful to the API
-            time.sleep(1)
+    # The total isn't known up front, so fetch a window of batched queries
+    # concurrently and stop at the first empty page; the pool size bounds the concurrency
+    accounts_per_query = BATCH_SIZE * PAGES_PER_QUERY
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        while has_more:
+            offsets = range(offset, offset + accounts_per_query * MAX_CONCURRENT_REQUESTS, accounts_per_query)
+            print(f"Fetching accounts at offsets {offsets[0]}-{offsets[-1] + accounts_per_query - 1}...")
+            results = executor.map(lambda o: fetch_accounts(session, start_offset=o), offsets)
+            
+            for query_offset, result in zip(offsets, results):
+                if result is None or "errors" in result:
+                    error_msg = result.get("errors", [{}])[0].get("message", "Unknown error") if result else "No response"
+                    print(f"Error fetching data: {error_msg}")
+                    has_more = False
+                    break
+                
+                # Aliases come back in query order, p0 first
+                for i, accounts in enumerate((result.get("data") or {}).values()):
+                    if not accounts:
+                        has_more = False
+                        print("Reached end of accounts")
+                        break
+                    if short_page_offset is not None:
+                        # A short page that wasn't the last one means the server caps
+                        # limit below BATCH_SIZE, so every page is missing its tail
+                        print(f"Error: page at offset {short_page_offset} returned fewer than "
+                              f"{BATCH_SIZE} accounts but later pages are not empty; "
+                              f"the endpoint caps limit, lower BATCH_SIZE")
+                        truncated = True
+                        has_more = False
+                        break
+                    all_accounts.extend(accounts)
+                    if len(accounts) < BATCH_SIZE:
+                        short_page_offset = query_offset + i * BATCH_SIZE
+                if not has_more:
+                    break
+            
+            print(f"Fetched {len(all_accounts)} accounts so far")
+            offset = offsets[-1] + accounts_per_query
     
-    if all_accounts:
+    if truncated:
+        print("Not exporting: balances would be incomplete")
+    elif all_accounts:
         export_to_csv(all_accounts, OUTPUT_FILE)
     else:
         print("No accounts found to export")